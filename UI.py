@@ -1,7 +1,6 @@
 import bpy
-import json
 from bpy.types import Operator
-from bpy.props import StringProperty, IntProperty, FloatProperty
+from bpy.props import StringProperty, IntProperty, FloatProperty, BoolProperty, EnumProperty
 import os
 import sys
 
@@ -13,17 +12,34 @@ script_dir = r'D:\Projects\Dev\Python\ETL02_blender'
 if script_dir not in sys.path:
     sys.path.insert(0, script_dir)
 
+import config_loader
+import object_scope
+from exporter import report_export, result_store
+
 # Function to load config defaults
 def load_config_defaults():
-    """Load default values from config.json"""
+    """Load default values from config.json (cached until the file changes)"""
     config_path = os.path.join(script_dir, "config.json")
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = json.load(f)
-    return config
+    return config_loader.load_config(config_path)
 
-# Load config defaults
+# Load config defaults, needed for the property defaults below
 config_loaded = load_config_defaults()
 
+# Evaluation modes of the close vertices check, as (identifier, name, description) items for EnumProperty
+close_vertices_mode_items = [
+    ('exhaustive', "Exhaustive", "Compare all vertex pairs, exact result"),
+    ('first_hit', "First Hit", "Stop at the first close pair, enough to know the mesh fails"),
+    ('sample', "Sample", "Search around random vertices within a time budget per object, reports the share covered"),
+]
+
+# Objects a run validates, see object_scope
+validation_scope_items = [
+    ('scene', "Scene", "All objects in the current scene"),
+    ('selection', "Selection", "Selected objects only"),
+    ('visible', "Visible", "Visible objects only"),
+    ('collections', "Collections", "Objects in the named collections (including child collections)"),
+]
+
 # Global variable to store current report content
 current_report_content = "Click 'Run Validation' to generate report..."
 
@@ -37,23 +53,51 @@ class ETL_OT_ValidationWindow(Operator): # Inherits from bpy.types.Operator
     max_faces: IntProperty(
         name="Max Faces",
         description="Maximum allowed face count per mesh",
-        default=config_loaded['max_faces'],
+        default=config_loaded.max_faces,
         min=1
     )
     
     min_vertex_distance: FloatProperty(
         name="Min Vertex Distance", 
         description="Minimum distance between vertices",
-        default=config_loaded['min_vertex_distance'],
+        default=config_loaded.min_vertex_distance,
         min=0.0001,
         precision=6
     )
     
+    close_vertices_mode: EnumProperty(
+        name="Close Vertices Mode",
+        description="How thoroughly the close vertices check compares vertex pairs",
+        items=close_vertices_mode_items,
+        default=config_loaded.close_vertices_mode
+    )
+    
+    sample_time_budget: FloatProperty(
+        name="Sample Time Budget",
+        description="Seconds per object in sample mode, including indexing the vertices",
+        default=config_loaded.sample_time_budget,
+        min=0.01,
+        precision=2
+    )
+    
+    validation_scope: EnumProperty(
+        name="Validate",
+        description="Which objects to validate",
+        items=validation_scope_items,
+        default=config_loaded.validation_scope
+    )
+    
+    scope_collections: StringProperty(
+        name="Collections",
+        description="Comma separated names of the collections to validate",
+        default=", ".join(config_loaded.scope_collections)
+    )
+    
     # Individual suffix properties (dynamic)
     suffix_count: IntProperty(
         name="Number of Suffixes",
         description="Number of allowed suffixes",
-        default=len(config_loaded['allowed_name_suffixes']),
+        default=len(config_loaded.allowed_name_suffixes),
         min=1,
         max=10
     )
@@ -69,6 +113,12 @@ class ETL_OT_ValidationWindow(Operator): # Inherits from bpy.types.Operator
     suffix_9: StringProperty(name="Suffix 9", default="")
     suffix_10: StringProperty(name="Suffix 10", default="")
     
+    only_new_failures: BoolProperty(
+        name="Only New Failures",
+        description="Show only failures that were not in the previous run of this file",
+        default=False
+    )
+    
     # Report content
     def get_report_content(self):
         return current_report_content
@@ -91,19 +141,17 @@ class ETL_OT_ValidationWindow(Operator): # Inherits from bpy.types.Operator
         default="Ready"
     )
     
-    def get_scene_stats(self):
+    def get_scene_stats(self, context):
         try:
-            # Count mesh objects only (exclude cameras, lights, etc.)
-            mesh_objects = [obj for obj in bpy.context.scene.objects if obj.type == 'MESH']
-            object_count = len(mesh_objects)
+            # Index the objects in scope once, mesh objects only are counted (exclude cameras, lights, etc.)
+            collections = [name.strip() for name in self.scope_collections.split(",") if name.strip()]
+            object_index = object_scope.build_object_index(context, self.validation_scope, collections)
+            object_count = len(object_index.meshes)
             
             # Count total faces across all mesh objects
-            total_faces = 0
-            for obj in mesh_objects:
-                if obj.data and hasattr(obj.data, 'polygons'):
-                    total_faces += len(obj.data.polygons)
+            total_faces = object_index.total_faces()
             
-            return f"Scene: {object_count} mesh objects, {total_faces} total faces"
+            return f"Scope: {object_count} mesh objects, {total_faces} total faces"
         except Exception as e:
             return f"Error getting scene stats: {str(e)}"
     
@@ -111,8 +159,15 @@ class ETL_OT_ValidationWindow(Operator): # Inherits from bpy.types.Operator
         return {'FINISHED'} # This operator does nothing by itself
     
     def invoke(self, context, event):
-        # Initialize individual suffix fields from the config defaults
-        suffixes = config_loaded['allowed_name_suffixes']
+        # Initialize fields from the config, picking up edits made since import (cheap when unchanged)
+        config = load_config_defaults()
+        self.max_faces = config.max_faces
+        self.min_vertex_distance = config.min_vertex_distance
+        self.close_vertices_mode = config.close_vertices_mode
+        self.sample_time_budget = config.sample_time_budget
+        self.validation_scope = config.validation_scope
+        self.scope_collections = ", ".join(config.scope_collections)
+        suffixes = config.allowed_name_suffixes
         self.suffix_count = len(suffixes)
         
         # Set individual suffix fields
@@ -141,6 +196,13 @@ class ETL_OT_ValidationWindow(Operator): # Inherits from bpy.types.Operator
         col = box.column()
         col.prop(self, "max_faces") # Expose properties to the UI
         col.prop(self, "min_vertex_distance")
+        col.prop(self, "close_vertices_mode")
+        if self.close_vertices_mode == 'sample':
+            col.prop(self, "sample_time_budget")
+        col.prop(self, "validation_scope")
+        if self.validation_scope == 'collections':
+            col.prop(self, "scope_collections")
+        col.prop(self, "only_new_failures")
         
         # Suffixes section
         suffix_box = box.box() # Box in a box, particularly for suffixes
@@ -164,11 +226,16 @@ class ETL_OT_ValidationWindow(Operator): # Inherits from bpy.types.Operator
         op = row.operator("etl.run_validation", text="Run Validation", icon='PLAY') # Button to run validation
         op.max_faces = self.max_faces # Pass parameters to the operator
         op.min_vertex_distance = self.min_vertex_distance
+        op.close_vertices_mode = self.close_vertices_mode
+        op.sample_time_budget = self.sample_time_budget
+        op.validation_scope = self.validation_scope
+        op.scope_collections = self.scope_collections
         for i in range(1, self.suffix_count + 1):
             suffix_value = getattr(self, f"suffix_{i}", "").strip() # Remove leading/trailing spaces, if any
             if suffix_value:
                 setattr(op, f"suffix_{i}", suffix_value) # Pass individual suffix values to the operator
         op.suffix_count = self.suffix_count # Pass the count of suffixes to the operator
+        op.only_new_failures = self.only_new_failures
         
         layout.separator()
         
@@ -177,7 +244,7 @@ class ETL_OT_ValidationWindow(Operator): # Inherits from bpy.types.Operator
         box.label(text="Scene Status:", icon='INFO')
         
         # Get current scene statistics
-        scene_stats = self.get_scene_stats()
+        scene_stats = self.get_scene_stats(context)
         box.label(text=scene_stats)
         
         layout.separator()
@@ -205,6 +272,10 @@ class ETL_OT_RunValidation(Operator):
     # Parameters passed from the dialog
     max_faces: IntProperty(default=100)
     min_vertex_distance: FloatProperty(default=0.001)
+    close_vertices_mode: EnumProperty(items=close_vertices_mode_items, default='exhaustive')
+    sample_time_budget: FloatProperty(default=0.5)
+    validation_scope: EnumProperty(items=validation_scope_items, default='scene')
+    scope_collections: StringProperty(default="")
     suffix_count: IntProperty(default=3)
     suffix_1: StringProperty(default="")
     suffix_2: StringProperty(default="")
@@ -216,6 +287,7 @@ class ETL_OT_RunValidation(Operator):
     suffix_8: StringProperty(default="")
     suffix_9: StringProperty(default="")
     suffix_10: StringProperty(default="")
+    only_new_failures: BoolProperty(default=False)
     
     def execute(self, context):
         try:
@@ -248,17 +320,19 @@ class ETL_OT_RunValidation(Operator):
     def update_config(self, suffixes):
         config_path = os.path.join(script_dir, "config.json")
         
-        config = {
+        values = {
             "max_faces": self.max_faces,
             "allowed_name_suffixes": suffixes,
-            "min_vertex_distance": self.min_vertex_distance
+            "min_vertex_distance": self.min_vertex_distance,
+            "close_vertices_mode": self.close_vertices_mode,
+            "sample_time_budget": self.sample_time_budget,
+            "validation_scope": self.validation_scope,
+            "scope_collections": [name.strip() for name in self.scope_collections.split(",") if name.strip()]
         }
         
-        try:
-            with open(config_path, "w", encoding="utf-8") as f:
-                json.dump(config, f, indent=4) # Write config with indentation
-        except Exception as e:
-            print(f"Error updating config: {e}")
+        # Written atomically, and only when a value actually changed.
+        # Invalid values raise, so execute() reports them instead of validating with the old settings
+        config_loader.save_config(config_path, values)
     
     def run_main_script(self):
         """Execute the main.py script"""
@@ -301,7 +375,12 @@ class ETL_OT_RunValidation(Operator):
         report_path = os.path.join(script_dir, "report.txt")
         
         try:
-            if os.path.exists(report_path):
+            if self.only_new_failures:
+                # Only the diff against the previous run, keeps the dialog small on huge scenes
+                current_report_content = self.get_new_failures_report()
+                print("New failures report loaded into UI successfully!")
+                
+            elif os.path.exists(report_path):
                 with open(report_path, 'r', encoding='utf-8') as f:
                     content = f.read()
                 
@@ -324,6 +403,28 @@ class ETL_OT_RunValidation(Operator):
         except Exception as e:
             current_report_content = f"Error loading report: {str(e)}"
             print(f"Error updating report in UI: {e}")
+    
+    def get_new_failures_report(self):
+        """Build the report text from failures that are new since the previous run of this file"""
+        db_path = os.path.join(script_dir, "results.db")
+        conn = result_store.open_store(db_path)
+        try:
+            run_label = object_scope.run_label(load_config_defaults()) # Same label main.py records the run with
+            run_id = result_store.latest_run_id(conn, run_label)
+            if run_id is None:
+                return "No validation run recorded for this file yet."
+            
+            diff = result_store.diff_runs(conn, run_id)
+            new_objects = result_store.rows_to_invalid_objects(diff['new'], run_label)
+            lines = report_export.format_invalid_objects_report(new_objects, title="New Failures Since Last Run",
+                                                                 empty_message="No new failures since the last run.")
+            if diff['previous_run'] is None:
+                lines.append("First recorded run, all failures are new.")
+            else:
+                lines.append(f"Fixed since last run: {len(diff['fixed'])} failed checks")
+            return "\n".join(lines)
+        finally:
+            conn.close()
 
 class ETL_OT_AddSuffix(Operator):
     bl_idname = "etl.add_suffix"
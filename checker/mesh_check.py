@@ -1,6 +1,8 @@
 import bpy
 import bmesh
-from mathutils import Vector
+import random
+import time
+from mathutils import Vector, kdtree
 
 def check_mesh_faces(obj, max_faces=50000):
     """Check if the mesh object exceeds the maximum allowed face count."""
@@ -12,73 +14,162 @@ def check_mesh_faces(obj, max_faces=50000):
             return True, f"Mesh '{obj.name}' face count OK: {face_count} <= {max_faces}"
     return True, f"Object '{obj.name}' is not a mesh, skipped face check." # Not a mesh object
 
-def check_close_vertices(obj, min_distance=0.001):
+def check_close_vertices(obj, min_distance=0.001, min_distance_sq=None):
     """
     Check if there are vertices that are too close to each other.
     
     Args:
         obj: Blender object to check
         min_distance: Minimum allowed distance between vertices
+        min_distance_sq: Precomputed min_distance squared (e.g. ValidationConfig.min_vertex_distance_sq)
     
     Returns:
         tuple: (is_valid, message, close_pairs_list)
     """
+    is_valid, message, close_pairs, _ = evaluate_close_vertices(obj, min_distance, min_distance_sq)
+    return is_valid, message, close_pairs
+
+def _close_pair(vertices, world_vertices, i, j, distance_sq):
+    return {
+        #'vertex_1': i,
+        #'vertex_2': j,
+        'vertex_1': vertices[i].index, # Use vertex index for better identification
+        'vertex_2': vertices[j].index,
+        'distance': distance_sq ** 0.5, # Square root only for pairs that are reported
+        'pos_1': world_vertices[i],
+        'pos_2': world_vertices[j]
+    }
+
+def _summarize_pairs(close_pairs):
+    """List the first 5 close pairs, and summarize the rest."""
+    close_pairs_summary = []
+    for pair in close_pairs[:5]:  # Show first 5 pairs
+        close_pairs_summary.append(f"vertices {pair['vertex_1']}-{pair['vertex_2']}: {pair['distance']:.6f}")
+    
+    summary_msg = ", ".join(close_pairs_summary)
+    if len(close_pairs) > 5:
+        summary_msg += f" (and {len(close_pairs) - 5} more)" # If there are more than 5 pairs, summarize the rest
+    return summary_msg
+
+def _random_order(count, seed):
+    """Indices 0..count-1 in a random but repeatable order, shuffled lazily so huge meshes cost nothing up front."""
+    rng = random.Random(seed)
+    moved = {} # Fisher-Yates swaps, position -> index, positions not in here still hold their own index
+    for k in range(count):
+        r = rng.randrange(k, count)
+        yield moved.get(r, r)
+        moved[r] = moved.pop(k, k)
+
+def evaluate_close_vertices(obj, min_distance=0.001, min_distance_sq=None, mode="exhaustive", time_budget=0.5):
+    """
+    Check if there are vertices that are too close to each other, with a selectable evaluation mode.
+    
+    Modes:
+        exhaustive: compare all pairs, the pair count is exact
+        first_hit: stop at the first close pair, the verdict is exact but the pair count is a lower bound
+        sample: search the neighbourhood of randomly chosen vertices (KD-tree range query) until
+                time_budget (seconds) runs out. The budget includes transforming and indexing the vertices,
+                on huge meshes only part of them gets indexed. A failure is certain, a pass may have missed close pairs.
+    
+    Returns:
+        tuple: (is_valid, message, close_pairs_list, evaluation)
+        evaluation: dict with mode, exact (all vertices covered), coverage (share of vertices searched) and
+                    detection_probability: the chance that any single close pair would have been found.
+                    It is not a confidence in the pass verdict as a whole, a mesh with several close pairs
+                    is more likely to be caught than this.
+    """
+    evaluation = {"mode": mode, "exact": True, "coverage": 1.0, "detection_probability": 1.0}
+    
     if obj.type != 'MESH': # Check if the object is a mesh
-        return True, f"Object '{obj.name}' is not a mesh, skipped close vertices check.", []
+        return True, f"Object '{obj.name}' is not a mesh, skipped close vertices check.", [], evaluation
     
     try:
         # Get mesh data
         mesh = obj.data
         vertices = mesh.vertices
+        vertex_count = len(vertices)
         
-        if len(vertices) < 2: # Check only object with more than 1 vertex
-            return True, f"Mesh '{obj.name}' has less than 2 vertices, skipped close vertices check.", []
+        if vertex_count < 2: # Check only object with more than 1 vertex
+            return True, f"Mesh '{obj.name}' has less than 2 vertices, skipped close vertices check.", [], evaluation
         
-        # Transform vertices to world coordinates
         world_matrix = obj.matrix_world # Get the world transform of the object
-        world_vertices = [world_matrix @ vertex.co for vertex in vertices] # World coordinates of vertices
+        
+        if min_distance_sq is None:
+            min_distance_sq = min_distance * min_distance
         
         close_pairs = []
         
-        # Check all pairs of vertices
-        for i in range(len(world_vertices)): # Iterate through each vertex
-            for j in range(i + 1, len(world_vertices)): # Compare with subsequent vertices
-                distance = (world_vertices[i] - world_vertices[j]).length # Get the distance between two vertices
-                
-                if distance < min_distance:
-                    close_pairs.append({
-                        #'vertex_1': i,
-                        #'vertex_2': j,
-                        'vertex_1': vertices[i].index, # Use vertex index for better identification
-                        'vertex_2': vertices[j].index,
-                        'distance': distance,
-                        'pos_1': world_vertices[i],
-                        'pos_2': world_vertices[j]
-                    })
+        if mode == "sample":
+            # The budget starts before the setup, transforming and indexing every vertex alone can take seconds
+            start = time.perf_counter()
+            deadline = start + time_budget
+            index_deadline = start + time_budget / 2 # Leave at least half of the budget for searching
+            
+            # Index the vertices in a random (but per object repeatable) order, as many as the budget allows.
+            # Each sampled vertex then only costs a neighbourhood query instead of a scan.
+            order = [] # Indexed vertices, in the order they were indexed
+            world_vertices = {} # Vertex index -> world coordinates, only for indexed vertices
+            tree = kdtree.KDTree(vertex_count)
+            for i in _random_order(vertex_count, obj.name):
+                order.append(i)
+                world_vertices[i] = world_matrix @ vertices[i].co
+                tree.insert(world_vertices[i], i)
+                if time.perf_counter() > index_deadline:
+                    break
+            tree.balance()
+            
+            # Visit the indexed vertices in the same order, close pairs are only found among indexed vertices
+            visited = set()
+            for i in order:
+                for _, j, distance in tree.find_range(world_vertices[i], min_distance):
+                    if j == i or j in visited or distance >= min_distance: # Pairs with visited vertices were already found
+                        continue
+                    close_pairs.append(_close_pair(vertices, world_vertices, min(i, j), max(i, j), distance * distance))
+                visited.add(i)
+                if time.perf_counter() > deadline:
+                    break
+            
+            coverage = len(visited) / vertex_count
+            if coverage < 1.0:
+                # A close pair is found if both of its vertices were indexed and at least one of them was visited
+                indexed = len(world_vertices) / vertex_count
+                evaluation.update(exact=False, coverage=coverage,
+                                  detection_probability=indexed ** 2 - (indexed - coverage) ** 2)
+        else:
+            world_vertices = [world_matrix @ vertex.co for vertex in vertices] # World coordinates of vertices
+            
+            # Check all pairs of vertices, stop at the first close pair in first_hit mode
+            for i in range(vertex_count): # Iterate through each vertex
+                for j in range(i + 1, vertex_count): # Compare with subsequent vertices
+                    # Compare squared lengths, only take the square root for pairs that are reported
+                    distance_sq = (world_vertices[i] - world_vertices[j]).length_squared
+                    if distance_sq < min_distance_sq:
+                        close_pairs.append(_close_pair(vertices, world_vertices, i, j, distance_sq))
+                        if mode == "first_hit":
+                            break
+                if close_pairs and mode == "first_hit":
+                    # The verdict is certain, but the remaining pairs were never compared
+                    evaluation.update(exact=False, coverage=(i + 1) / vertex_count)
+                    break
         
-        # Report close vertex pairs
-        if len(close_pairs) > 0:
-            if len(close_pairs) <= 5:
-                # List all close pairs if 5 or fewer
-                close_pairs_summary = []
-                for pair in close_pairs:
-                    close_pairs_summary.append(f"vertices {pair['vertex_1']}-{pair['vertex_2']}: {pair['distance']:.6f}")
-                summary_msg = ", ".join(close_pairs_summary)
-                return False, f"Mesh '{obj.name}' has {len(close_pairs)} vertex pairs closer than {min_distance}: {summary_msg}", close_pairs
+        # Report close vertex pairs, marking results that did not cover every pair
+        if not evaluation["exact"]:
+            if mode == "first_hit":
+                marker = " [early exit]"
             else:
-                # Summarize if more than 5 pairs
-                close_pairs_summary = []
-                for pair in close_pairs[:5]:  # Show first 5 pairs
-                    close_pairs_summary.append(f"vertices {pair['vertex_1']}-{pair['vertex_2']}: {pair['distance']:.6f}")
-                
-                summary_msg = ", ".join(close_pairs_summary)
-                summary_msg += f" (and {len(close_pairs) - 5} more)" # If there are more than 5 pairs, summarize the rest
-                
-                return False, f"Mesh '{obj.name}' has {len(close_pairs)} vertex pairs closer than {min_distance}: {summary_msg}", close_pairs
+                marker = f" [sampled {evaluation['coverage']:.0%} of vertices"
+                if not close_pairs:
+                    marker += f", {evaluation['detection_probability']:.0%} chance to catch any one close pair"
+                marker += "]"
         else:
-            return True, f"Mesh '{obj.name}' has no vertices closer than {min_distance}", []
+            marker = ""
+        
+        if len(close_pairs) > 0:
+            count = f"{len(close_pairs)}" if evaluation["exact"] else f"at least {len(close_pairs)}"
+            return False, (f"Mesh '{obj.name}' has {count} vertex pairs closer than {min_distance}: "
+                           f"{_summarize_pairs(close_pairs)}{marker}"), close_pairs, evaluation
+        else:
+            return True, f"Mesh '{obj.name}' has no vertices closer than {min_distance}{marker}", [], evaluation
             
     except Exception as e: # Handle any exceptions that occur during the check
-        return False, f"Error checking close vertices for '{obj.name}': {str(e)}", []
-
-
+        return False, f"Error checking close vertices for '{obj.name}': {str(e)}", [], evaluation
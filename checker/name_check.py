@@ -2,8 +2,10 @@ def check_object_name(obj, allowed_suffixes=("_geo", "_jnt", "_grp")):
     """
     Check if the object's name ends with one of the allowed suffixes.
     Allowed suffixes default to ("_geo", "_jnt", "_grp").
+    Pass a tuple (e.g. ValidationConfig.name_suffixes) to skip the conversion per object.
     """
-    # allowed_suffixes can be a list or a tuple, ensure compatibility
-    if not any(obj.name.endswith(suffix) for suffix in allowed_suffixes):
-        return False, f"Object '{obj.name}' does not end with {allowed_suffixes}."
-    return True, f"Object '{obj.name}' naming OK (ends with {allowed_suffixes})."
\ No newline at end of file
+    # str.endswith() only accepts a tuple, convert lists once
+    suffixes = allowed_suffixes if isinstance(allowed_suffixes, tuple) else tuple(allowed_suffixes)
+    if not obj.name.endswith(suffixes):
+        return False, f"Object '{obj.name}' does not end with {list(suffixes)}."
+    return True, f"Object '{obj.name}' naming OK (ends with {list(suffixes)})."
\ No newline at end of file
@@ -0,0 +1,247 @@
+import json
+import os
+import tempfile
+
+#######################################################################################################################
+# Typed, cached access to config.json shared by main.py and UI.py.
+#######################################################################################################################
+
+# Schema of the validation settings: key -> (expected type, default value)
+CONFIG_SCHEMA = {
+    "max_faces": (int, 50000),
+    "min_vertex_distance": (float, 0.001),
+    "allowed_name_suffixes": (list, ["_geo", "_jnt", "_grp"]),
+    "close_vertices_mode": (str, "exhaustive"),
+    "sample_time_budget": (float, 0.5),
+    "validation_scope": (str, "scene"),
+    "scope_collections": (list, []),
+}
+
+# Evaluation modes of the close vertices check, see mesh_check.evaluate_close_vertices
+EVALUATION_MODES = ("exhaustive", "first_hit", "sample")
+
+# Which objects a run validates, see object_scope
+VALIDATION_SCOPES = ("scene", "selection", "visible", "collections")
+
+# Keys in config.json that are not settings themselves
+PROFILES_KEY = "profiles"
+ACTIVE_PROFILE_KEY = "active_profile"
+
+# Parsed configs keyed by (path, profile), each stored with the file signature it was built from.
+# Kept across importlib.reload() so the development reload in main.py does not throw the cache away.
+try:
+    _config_cache
+except NameError:
+    _config_cache = {}
+
+
+class ValidationConfig:
+    """
+    Validated settings with derived values precomputed once for the checkers.
+    Read-only, since the cached config is shared by every caller of load_config(). Use with_values() for changes.
+    """
+
+    def __init__(self, max_faces, min_vertex_distance, allowed_name_suffixes, close_vertices_mode="exhaustive",
+                 sample_time_budget=0.5, validation_scope="scene", scope_collections=(), profile=None):
+        allowed_name_suffixes = tuple(allowed_name_suffixes) # Tuples, so the lists can't be changed in place either
+        self.__dict__.update(
+            max_faces=max_faces,
+            min_vertex_distance=min_vertex_distance,
+            allowed_name_suffixes=allowed_name_suffixes,
+            close_vertices_mode=close_vertices_mode,
+            sample_time_budget=sample_time_budget, # Seconds per object in sample mode
+            validation_scope=validation_scope,
+            scope_collections=tuple(scope_collections), # Collection names, used by the "collections" scope
+            profile=profile, # Name of the profile overlay applied, None for the base settings
+
+            # Derived values, so checkers don't recompute them for every object
+            min_vertex_distance_sq=min_vertex_distance * min_vertex_distance, # Compare against squared lengths
+            name_suffixes=allowed_name_suffixes, # str.endswith() accepts a tuple directly
+        )
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"ValidationConfig is read-only, use with_values({key}=...) for a changed copy")
+
+    def __delattr__(self, key):
+        raise AttributeError("ValidationConfig is read-only")
+
+    def __getitem__(self, key):
+        # Keep supporting config["max_faces"] style lookups
+        if key not in CONFIG_SCHEMA:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def with_values(self, **changes):
+        """Return a validated copy with some settings replaced, the config itself may be the shared cached one."""
+        values = _coerce_values(dict(self.to_dict(), **changes))
+        return ValidationConfig(profile=self.profile, **values)
+
+    def to_dict(self):
+        """Return the schema settings as a plain dictionary (as stored in config.json)."""
+        values = {key: getattr(self, key) for key in CONFIG_SCHEMA}
+        return {key: list(value) if isinstance(value, tuple) else value for key, value in values.items()}
+
+    def __repr__(self):
+        return f"ValidationConfig({self.to_dict()}, profile={self.profile!r})"
+
+
+def scope_suffix(config):
+    """Suffix keeping runs with different scopes apart in the result history, empty for the whole scene."""
+    if config.validation_scope == "collections":
+        return f" [collections: {', '.join(config.scope_collections)}]"
+    if config.validation_scope != "scene":
+        return f" [{config.validation_scope}]"
+    return ""
+
+
+def _coerce_value(key, value):
+    """Check a single setting against the schema and return it with the expected type."""
+    expected_type, _ = CONFIG_SCHEMA[key]
+
+    if isinstance(value, bool): # bool is a subclass of int, never accept it as a number
+        raise ValueError(f"Config '{key}' must be {expected_type.__name__}, got bool")
+
+    if expected_type is float and isinstance(value, int):
+        value = float(value) # JSON writes 1.0 back as 1 in some editors
+    if not isinstance(value, expected_type):
+        raise ValueError(f"Config '{key}' must be {expected_type.__name__}, got {type(value).__name__}")
+
+    if key == "max_faces" and value < 1:
+        raise ValueError(f"Config 'max_faces' must be at least 1, got {value}")
+    if key == "min_vertex_distance" and value < 0:
+        raise ValueError(f"Config 'min_vertex_distance' must not be negative, got {value}")
+    if expected_type is list:
+        if not all(isinstance(item, str) for item in value):
+            raise ValueError(f"Config '{key}' must be a list of strings")
+        value = list(value)
+    if key == "close_vertices_mode" and value not in EVALUATION_MODES:
+        raise ValueError(f"Config 'close_vertices_mode' must be one of {EVALUATION_MODES}, got '{value}'")
+    if key == "sample_time_budget" and value <= 0:
+        raise ValueError(f"Config 'sample_time_budget' must be positive, got {value}")
+    if key == "validation_scope" and value not in VALIDATION_SCOPES:
+        raise ValueError(f"Config 'validation_scope' must be one of {VALIDATION_SCOPES}, got '{value}'")
+
+    return value
+
+
+def _coerce_values(values):
+    """Coerce every setting with _coerce_value, then check the rules that involve several settings."""
+    values = {key: _coerce_value(key, value) for key, value in values.items()}
+    if values.get("validation_scope") == "collections" and not values.get("scope_collections"):
+        raise ValueError("Config 'validation_scope' is 'collections' but 'scope_collections' is empty")
+    return values
+
+
+def _read_raw(config_path):
+    """Read config.json as a dictionary, or an empty one if the file does not exist yet."""
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict):
+        raise ValueError(f"Config file {config_path} must contain a JSON object")
+    return raw
+
+
+def _resolve_values(raw, profile=None):
+    """Schema defaults overlaid with the base settings, then with the given profile (none if falsy)."""
+    # A misspelled setting would otherwise silently fall back to its default
+    unknown = [key for key in raw if key not in CONFIG_SCHEMA and key not in (PROFILES_KEY, ACTIVE_PROFILE_KEY)]
+    if unknown:
+        raise ValueError(f"Config has unknown keys: {unknown}")
+
+    values = {key: default for key, (_, default) in CONFIG_SCHEMA.items()}
+    values.update({key: raw[key] for key in CONFIG_SCHEMA if key in raw})
+
+    if profile:
+        profiles = raw.get(PROFILES_KEY, {})
+        if profile not in profiles:
+            raise ValueError(f"Config profile '{profile}' not found, available: {sorted(profiles)}")
+        overlay = profiles[profile]
+        unknown = [key for key in overlay if key not in CONFIG_SCHEMA]
+        if unknown:
+            raise ValueError(f"Config profile '{profile}' has unknown keys: {unknown}")
+        values.update(overlay)
+
+    return _coerce_values(values)
+
+
+def build_config(raw, profile=None):
+    """
+    Build a ValidationConfig from a raw config dictionary.
+    Schema defaults are overlaid with the base settings, then with the selected profile.
+    If profile is None, the file's "active_profile" is used (if any).
+    """
+    if profile is None:
+        profile = raw.get(ACTIVE_PROFILE_KEY)
+    return ValidationConfig(profile=profile or None, **_resolve_values(raw, profile))
+
+
+def load_config(config_path, profile=None):
+    """
+    Load config.json into a ValidationConfig.
+    The parsed result is cached and only rebuilt when the file's mtime or size changes.
+    """
+    try:
+        stat = os.stat(config_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        signature = None # Missing file means schema defaults
+
+    cache_key = (os.path.abspath(config_path), profile)
+    cached = _config_cache.get(cache_key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    config = build_config(_read_raw(config_path), profile)
+    _config_cache[cache_key] = (signature, config)
+    return config
+
+
+def save_config(config_path, values, profile=None):
+    """
+    Store changed settings in config.json.
+    Values go into the given profile (or the file's active profile), otherwise into the base settings.
+    A profile only stores the keys whose value differs from the base settings.
+    Other keys in the file are preserved. The file is written atomically, and only if something changed.
+    Returns True if the file was written.
+    """
+    values = {key: _coerce_value(key, value) for key, value in values.items()}
+    raw = _read_raw(config_path)
+
+    if profile is None:
+        profile = raw.get(ACTIVE_PROFILE_KEY)
+    if profile:
+        overlay = raw.setdefault(PROFILES_KEY, {}).setdefault(profile, {})
+
+    # Compare against the resolved settings, not the raw entries, so a profile only gets the keys it overrides
+    resolved = _resolve_values(raw, profile)
+    _coerce_values(dict(resolved, **values)) # The new values must also be valid together with the others
+    changed = {key: value for key, value in values.items() if resolved[key] != value}
+    if not changed:
+        return False
+
+    if profile:
+        base = _resolve_values(raw)
+        for key, value in changed.items():
+            if value == base[key]:
+                overlay.pop(key, None) # Back to the base value, let the base setting show through again
+            else:
+                overlay[key] = value
+    else:
+        raw.update(changed)
+
+    # Write to a temporary file next to config.json, then swap it in so readers never see a partial file
+    directory = os.path.dirname(os.path.abspath(config_path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".config_", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(raw, f, indent=4)
+        os.replace(tmp_path, config_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    print(f"Config updated: {sorted(changed)}")
+    return True
@@ -0,0 +1,283 @@
+import argparse
+import heapq
+import os
+import shlex
+import subprocess
+import sys
+import time
+
+# Make the project modules importable when run as a script
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+import config_loader
+from distributed.file_queue import FileQueue, HEARTBEAT_INTERVAL, read_json, write_json_atomic
+from exporter import report_export, result_store
+
+#######################################################################################################################
+# Coordinator for sharded validation of a whole asset library across several machines.
+# Runs in plain Python (no Blender needed), workers run distributed/worker.py inside Blender:
+#   python distributed/coordinator.py D:/assets --queue //server/etl_queue --workers 8 --report report.txt
+#######################################################################################################################
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py")
+DEFAULT_WORKER_COMMAND = f'blender -b --factory-startup --python "{WORKER_SCRIPT}" --'
+
+SHARDS_PER_WORKER = 4 # More shards than workers, so fast workers simply claim more of them
+BYTES_PER_FACE = 200 # Rough .blend size per face, used until a file's real face count is cached
+STALE_TIMEOUT = 60.0 # Seconds without heartbeat before a worker's shards are handed to others
+MISSED_HEARTBEATS = 3 # The stale timeout must cover more than this many heartbeat intervals
+SHUTDOWN_TIMEOUT = 30.0 # Seconds local workers get to exit after STOP, e.g. while still busy with a backup copy
+
+
+def find_blend_files(paths):
+    """Collect .blend files from the given files and folders (backups like .blend1 are skipped)."""
+    blend_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                blend_files.extend(os.path.join(root, name) for name in names if name.lower().endswith(".blend"))
+        elif path.lower().endswith(".blend"):
+            blend_files.append(path)
+    return sorted(os.path.abspath(path) for path in blend_files)
+
+
+def load_cost_cache(cache_path):
+    if not cache_path:
+        return {}
+    return read_json(cache_path) or {}
+
+
+def estimate_cost(filepath, cost_cache):
+    """Estimated cost of a file in faces: the cached face count if the file is unchanged, else from its size."""
+    stat = os.stat(filepath)
+    entry = cost_cache.get(filepath)
+    if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+        return max(entry["face_count"], 1)
+    return max(stat.st_size // BYTES_PER_FACE, 1)
+
+
+def make_shards(blend_files, cost_cache, shard_count):
+    """
+    Split files into shards of similar total cost (largest files first onto the lightest shard).
+    Shards are returned most expensive first, so they are also claimed in that order.
+    """
+    costs = sorted(((estimate_cost(path, cost_cache), path) for path in blend_files), reverse=True)
+    shard_count = max(1, min(shard_count, len(costs)))
+
+    heap = [(0, index, []) for index in range(shard_count)] # (total cost, index, files)
+    for cost, path in costs:
+        total, index, files = heapq.heappop(heap)
+        files.append(path)
+        heapq.heappush(heap, (total + cost, index, files))
+
+    shards = sorted((shard for shard in heap if shard[2]), key=lambda shard: shard[0], reverse=True)
+    return [{"id": f"{number:05d}", "cost": total, "files": files}
+            for number, (total, _, files) in enumerate(shards)]
+
+
+class Liveness:
+    """
+    When the coordinator last saw each heartbeat change and each claim appear, on the coordinator's own clock.
+    Times written by workers (or file times set by their machines) are never used, their clocks may be skewed.
+    """
+
+    def __init__(self):
+        self.beats = {} # worker_id -> (last beat number, coordinator time it was first seen)
+        self.claims = {} # (shard_id, worker_id) -> coordinator time the claim was first seen
+
+    def update(self, heartbeats, claims, now):
+        for worker_id, beat in heartbeats.items():
+            number = beat.get("beat")
+            if worker_id not in self.beats or self.beats[worker_id][0] != number:
+                self.beats[worker_id] = (number, now)
+        self.claims = {claim: self.claims.get(claim, now) for claim in claims}
+
+    def silence(self, worker_id, now, since=None):
+        """Seconds since the worker's heartbeat last changed, or since `since` if it never sent one."""
+        last_seen = self.beats[worker_id][1] if worker_id in self.beats else since
+        return now - last_seen
+
+
+def rebalance(queue, finished, backed_up, stale_timeout, liveness):
+    """
+    Hand work of dead or slow workers to others.
+    Shards of workers whose heartbeat stopped changing are put back into the queue. When the queue is empty while
+    some workers idle, the oldest running shard gets a backup copy, whichever copy finishes first wins.
+    """
+    now = time.time()
+    heartbeats = queue.heartbeats()
+    liveness.update(heartbeats, queue.claims(), now)
+    running = []
+
+    for (shard_id, worker_id), claim_time in liveness.claims.items():
+        if shard_id in finished:
+            continue
+        if liveness.silence(worker_id, now, since=claim_time) > stale_timeout:
+            if queue.requeue(shard_id, worker_id):
+                print(f"Worker {worker_id} stopped responding, shard {shard_id} requeued")
+        else:
+            running.append((claim_time, shard_id, worker_id))
+
+    idle_workers = [worker for worker, beat in heartbeats.items()
+                    if beat["state"] == "idle" and liveness.silence(worker, now) <= stale_timeout]
+    if queue.pending_count() == 0 and idle_workers:
+        for _, shard_id, worker_id in sorted(running):
+            if shard_id not in backed_up:
+                if queue.requeue(shard_id, worker_id, keep_claim=True):
+                    backed_up.add(shard_id)
+                    print(f"Worker {worker_id} is behind, backup copy of shard {shard_id} queued")
+                break
+
+
+def merge_results(results, cost_cache):
+    """
+    Merge shard results into one invalid objects list and one sampled results list.
+    The face counts are stored in the cost cache. Returns (invalid_objects, sampled_results).
+    """
+    invalid_objects = []
+    sampled_results = []
+    for result in results.values():
+        for entry in result["files"]:
+            filepath = entry["file"]
+            if entry["error"]:
+                invalid_objects.append({"file": filepath, "object": os.path.basename(filepath),
+                                        "reasons": [f"Error validating file: {entry['error']}"],
+                                        "checks": [result_store.FILE_ERROR_CHECK]})
+                continue
+            for item in entry["invalid_objects"]:
+                invalid_objects.append(dict(item, file=filepath))
+            for item in entry.get("sampled_results", []):
+                sampled_results.append(dict(item, file=filepath))
+            if entry["face_count"] is not None and os.path.exists(filepath):
+                stat = os.stat(filepath)
+                cost_cache[filepath] = {"size": stat.st_size, "mtime": stat.st_mtime,
+                                        "face_count": entry["face_count"]}
+
+    invalid_objects.sort(key=lambda item: (item["file"], item["object"]))
+    sampled_results.sort(key=lambda item: (item["file"], item["object"]))
+    return invalid_objects, sampled_results
+
+
+def start_local_workers(queue_dir, count, worker_command, extra_args=()):
+    """Start worker processes on this machine, e.g. to stand in for other machines when testing."""
+    processes = []
+    for index in range(count):
+        # Non-POSIX splitting keeps Windows backslashes, but leaves the quotes around arguments
+        command = [part.strip('"') for part in shlex.split(worker_command, posix=(os.name != "nt"))]
+        command += ["--queue", queue_dir, "--worker-id", f"local-{index + 1}"]
+        processes.append(subprocess.Popen(command + list(extra_args)))
+    return processes
+
+
+def run_coordinator(blend_files, queue_dir, config, report_path, worker_count=4, local_workers=0,
+                    worker_command=DEFAULT_WORKER_COMMAND, worker_args=(), cost_cache_path=None,
+                    stale_timeout=STALE_TIMEOUT, poll_interval=1.0, results_db=None, run_label="library",
+                    heartbeat_interval=HEARTBEAT_INTERVAL, shutdown_timeout=SHUTDOWN_TIMEOUT,
+                    scope="scene", scope_collections=()):
+    """
+    Shard the files, wait for all results and export one merged report. Returns the invalid objects.
+    With results_db the merged results are also appended to the result history store, under run_label plus the scope.
+    The scope replaces the one in config: the dialog saves its last scope (e.g. the selection) to config.json,
+    which must not limit a library run to whatever each .blend file had selected when it was saved.
+    """
+    # Live workers must never look dead, or their shards are requeued and validated twice
+    if stale_timeout <= heartbeat_interval * MISSED_HEARTBEATS:
+        raise ValueError(f"Stale timeout {stale_timeout}s must be more than {MISSED_HEARTBEATS} heartbeat "
+                         f"intervals ({heartbeat_interval * MISSED_HEARTBEATS}s)")
+
+    config = config.with_values(validation_scope=scope, scope_collections=list(scope_collections))
+
+    queue = FileQueue(queue_dir)
+    queue.reset()
+    queue.set_heartbeat_interval(heartbeat_interval)
+    # Every setting is written, so workers never fall back to the schema defaults of their own checkout
+    write_json_atomic(queue.config_path, config.to_dict())
+
+    cost_cache = load_cost_cache(cost_cache_path)
+    shards = make_shards(blend_files, cost_cache, max(worker_count, local_workers, 1) * SHARDS_PER_WORKER)
+    for shard in shards:
+        queue.put_shard(shard)
+    print(f"Queued {len(blend_files)} files in {len(shards)} shards")
+
+    processes = start_local_workers(queue_dir, local_workers, worker_command, worker_args)
+    finished = {}
+    backed_up = set()
+    liveness = Liveness()
+    try:
+        while len(finished) < len(shards):
+            finished.update(queue.results(skip=finished))
+            if len(finished) == len(shards):
+                break
+            if processes and all(process.poll() is not None for process in processes):
+                raise RuntimeError("All local workers exited before the validation finished")
+            rebalance(queue, finished, backed_up, stale_timeout, liveness)
+            time.sleep(poll_interval)
+    finally:
+        queue.stop() # Tell the workers to exit
+        deadline = time.time() + shutdown_timeout
+        for process in processes:
+            try:
+                process.wait(timeout=max(deadline - time.time(), 0))
+            except subprocess.TimeoutExpired:
+                process.terminate() # Still busy with a shard whose other copy already finished
+                process.wait()
+
+    invalid_objects, sampled_results = merge_results(finished, cost_cache)
+    if cost_cache_path:
+        write_json_atomic(cost_cache_path, cost_cache)
+    report_export.export_invalid_objects_report(invalid_objects, report_path, sampled_results)
+
+    if results_db:
+        conn = result_store.open_store(results_db)
+        try:
+            label = run_label + config_loader.scope_suffix(config) # Never diff a collections run against whole scenes
+            run_id = result_store.record_run(conn, invalid_objects, label, config.to_dict(), sampled_results)
+            diff = result_store.diff_runs(conn, run_id)
+            print(f"Run {run_id}: {len(diff['new'])} new failures, {len(diff['fixed'])} fixed since last run")
+        finally:
+            conn.close()
+    return invalid_objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coordinate a sharded validation run over many .blend files")
+    parser.add_argument("paths", nargs="+", help=".blend files or folders to validate")
+    parser.add_argument("--queue", required=True, help="Queue folder shared with all workers")
+    parser.add_argument("--config", default=os.path.join(script_dir, "config.json"), help="Config file to use")
+    parser.add_argument("--profile", default=None, help="Config profile to apply")
+    parser.add_argument("--report", default=os.path.join(script_dir, "report.txt"), help="Merged report path")
+    parser.add_argument("--workers", type=int, default=4, help="Expected number of workers, sets the shard count")
+    parser.add_argument("--local-workers", type=int, default=0, help="Worker processes to start on this machine")
+    parser.add_argument("--worker-command", default=DEFAULT_WORKER_COMMAND, help="Command starting a local worker")
+    parser.add_argument("--validator", default="", help="module:function passed to local workers (testing)")
+    parser.add_argument("--results-db", default=None, help="Result history store to append this run to")
+    parser.add_argument("--label", default="library", help="Runs with the same label and scope are diffed against each other")
+    parser.add_argument("--cost-cache", default=None, help="JSON file with face counts from previous runs")
+    parser.add_argument("--stale-timeout", type=float, default=STALE_TIMEOUT, help="Seconds before a silent worker is dropped")
+    parser.add_argument("--scope", choices=config_loader.VALIDATION_SCOPES, default="scene",
+                        help="Objects to validate in each file, config.json's scope is ignored for library runs")
+    parser.add_argument("--collections", nargs="*", default=[], help="Collection names for --scope collections")
+    parser.add_argument("--heartbeat-interval", type=float, default=HEARTBEAT_INTERVAL,
+                        help="Seconds between worker heartbeats, sent to the workers through the queue")
+    args = parser.parse_args()
+    if args.stale_timeout <= args.heartbeat_interval * MISSED_HEARTBEATS:
+        parser.error(f"--stale-timeout must be more than {MISSED_HEARTBEATS} x --heartbeat-interval "
+                     f"({args.heartbeat_interval * MISSED_HEARTBEATS}s)")
+
+    config = config_loader.load_config(args.config, args.profile)
+    worker_args = ["--validator", args.validator] if args.validator else []
+    cost_cache_path = args.cost_cache or os.path.join(args.queue, "cost_cache.json")
+
+    start = time.time()
+    invalid_objects = run_coordinator(find_blend_files(args.paths), args.queue, config, args.report,
+                                      args.workers, args.local_workers, args.worker_command, worker_args,
+                                      cost_cache_path, args.stale_timeout, results_db=args.results_db,
+                                      run_label=args.label, heartbeat_interval=args.heartbeat_interval,
+                                      scope=args.scope, scope_collections=args.collections)
+    print(f"Validation finished in {time.time() - start:.1f}s, {len(invalid_objects)} invalid objects")
+
+
+if __name__ == "__main__":
+    main()
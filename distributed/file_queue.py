@@ -0,0 +1,174 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+
+#######################################################################################################################
+# File based work queue shared by the coordinator and the workers.
+# Any folder all machines can reach (local disk or a network share) works as the queue.
+#
+#   pending/<shard>.json              shards waiting to be claimed (sorted names, most expensive first)
+#   claimed/<shard>__<worker>.json    shards a worker is busy with (claimed by an atomic rename)
+#   results/<shard>.json              finished shard results
+#   heartbeats/<worker>.json          last sign of life of each worker, a new beat number every time
+#   config.json                       resolved validation settings for this run
+#   protocol.json                     queue settings for the workers (heartbeat interval)
+#   STOP                              written by the coordinator when all shards are done
+#######################################################################################################################
+
+CLAIM_SEPARATOR = "__"
+HEARTBEAT_INTERVAL = 5.0 # Default seconds between worker heartbeats, the coordinator can override it per run
+
+
+def write_json_atomic(filepath, data):
+    """Write JSON to a temporary file first, then swap it in so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp_", suffix=".json", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, filepath)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def read_json(filepath):
+    """Read a JSON file, or None if it vanished or is not complete yet."""
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+class FileQueue:
+    """Shard queue living in a shared folder."""
+
+    def __init__(self, root):
+        self.root = root
+        self.pending_dir = os.path.join(root, "pending")
+        self.claimed_dir = os.path.join(root, "claimed")
+        self.results_dir = os.path.join(root, "results")
+        self.heartbeats_dir = os.path.join(root, "heartbeats")
+        self.config_path = os.path.join(root, "config.json")
+        self.protocol_path = os.path.join(root, "protocol.json")
+        self.stop_path = os.path.join(root, "STOP")
+
+        # Heartbeats are told apart by number, the coordinator never compares its clock with a worker's
+        self._heartbeat_session = uuid.uuid4().hex # A restarted worker with the same id still looks changed
+        self._heartbeat_count = 0
+
+    def reset(self):
+        """Clear any previous run and create the folder layout (coordinator only)."""
+        for directory in (self.pending_dir, self.claimed_dir, self.results_dir, self.heartbeats_dir):
+            if os.path.exists(directory):
+                shutil.rmtree(directory)
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.stop_path):
+            os.remove(self.stop_path)
+
+    # Shards
+    def put_shard(self, shard):
+        write_json_atomic(os.path.join(self.pending_dir, f"{shard['id']}.json"), shard)
+
+    def pending_count(self):
+        return len([name for name in os.listdir(self.pending_dir)
+                    if name.endswith(".json") and not name.startswith(".tmp_")])
+
+    def claim(self, worker_id):
+        """Claim the next pending shard for this worker, or return None if nothing is left."""
+        for name in sorted(os.listdir(self.pending_dir)):
+            if not name.endswith(".json") or name.startswith(".tmp_"):
+                continue
+            shard_id = name[:-len(".json")]
+            claim_path = os.path.join(self.claimed_dir, f"{shard_id}{CLAIM_SEPARATOR}{worker_id}.json")
+            try:
+                os.rename(os.path.join(self.pending_dir, name), claim_path) # Atomic, only one worker wins
+            except OSError:
+                continue # Another worker was faster
+            shard = read_json(claim_path)
+            if shard is not None:
+                return shard
+        return None
+
+    def claims(self):
+        """Return a list of (shard_id, worker_id) for all shards being worked on."""
+        claims = []
+        for name in os.listdir(self.claimed_dir):
+            if name.endswith(".json") and CLAIM_SEPARATOR in name:
+                claims.append(tuple(name[:-len(".json")].split(CLAIM_SEPARATOR, 1)))
+        return claims
+
+    def release(self, shard_id, worker_id):
+        """Drop a worker's claim once its result is written."""
+        claim_path = os.path.join(self.claimed_dir, f"{shard_id}{CLAIM_SEPARATOR}{worker_id}.json")
+        if os.path.exists(claim_path):
+            os.remove(claim_path)
+
+    def requeue(self, shard_id, worker_id, keep_claim=False):
+        """
+        Put a claimed shard back into pending.
+        With keep_claim the original worker keeps going and the shard is only duplicated (backup task),
+        whichever copy finishes first wins.
+        """
+        claim_path = os.path.join(self.claimed_dir, f"{shard_id}{CLAIM_SEPARATOR}{worker_id}.json")
+        shard = read_json(claim_path)
+        if shard is None:
+            return False
+        self.put_shard(shard)
+        if not keep_claim:
+            self.release(shard_id, worker_id)
+        return True
+
+    # Results
+    def put_result(self, result):
+        write_json_atomic(os.path.join(self.results_dir, f"{result['shard']}.json"), result)
+
+    def has_result(self, shard_id):
+        return os.path.exists(os.path.join(self.results_dir, f"{shard_id}.json"))
+
+    def results(self, skip=()):
+        """Return finished results as a dictionary keyed by shard id, shard ids in skip are not read again."""
+        results = {}
+        for name in os.listdir(self.results_dir):
+            if name.endswith(".json") and not name.startswith(".tmp_") and name[:-len(".json")] not in skip:
+                result = read_json(os.path.join(self.results_dir, name))
+                if result is not None:
+                    results[result["shard"]] = result
+        return results
+
+    # Workers
+    def set_heartbeat_interval(self, seconds):
+        write_json_atomic(self.protocol_path, {"heartbeat_interval": seconds})
+
+    def heartbeat_interval(self):
+        """Seconds between heartbeats asked for by the coordinator, re-read so late starting workers pick it up."""
+        protocol = read_json(self.protocol_path)
+        return protocol["heartbeat_interval"] if protocol else HEARTBEAT_INTERVAL
+
+    def heartbeat(self, worker_id, state):
+        self._heartbeat_count += 1
+        write_json_atomic(os.path.join(self.heartbeats_dir, f"{worker_id}.json"),
+                          {"worker": worker_id, "state": state, "beat": [self._heartbeat_session, self._heartbeat_count],
+                           "time": time.time()}) # Worker clock, only for people looking into the queue
+
+    def heartbeats(self):
+        """Return {worker_id: {"state": ..., "beat": [session, count], "time": ...}} for every worker seen so far."""
+        heartbeats = {}
+        for name in os.listdir(self.heartbeats_dir):
+            if name.endswith(".json") and not name.startswith(".tmp_"):
+                beat = read_json(os.path.join(self.heartbeats_dir, name))
+                if beat is not None:
+                    heartbeats[beat["worker"]] = beat
+        return heartbeats
+
+    def stop(self):
+        with open(self.stop_path, "w", encoding="utf-8") as f:
+            f.write("done\n")
+
+    def should_stop(self):
+        return os.path.exists(self.stop_path)
@@ -0,0 +1,129 @@
+import argparse
+import importlib
+import os
+import socket
+import sys
+import threading
+import time
+
+# Make the project modules importable when run as a script (python worker.py / blender --python worker.py)
+script_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+import config_loader
+from distributed.file_queue import FileQueue
+
+#######################################################################################################################
+# Validation worker: claims shards of .blend files from the queue and writes back the results.
+# Run it inside Blender on every machine:
+#   blender -b --factory-startup --python distributed/worker.py -- --queue <shared folder> --worker-id <name>
+#######################################################################################################################
+
+
+def validate_blend_file(filepath, config):
+    """
+    Open a .blend file and run all checks on it.
+    Returns (invalid_objects, face_count, sampled_results). The face count is fed back into the coordinator's
+    cost cache, sampled_results lists checks that passed without covering every vertex.
+    """
+    import bpy
+    import main # Only importable inside Blender
+    import object_scope
+
+    bpy.ops.wm.open_mainfile(filepath=filepath)
+    # One index per file, shared by the checks and the face count
+    object_index = object_scope.build_object_index(bpy.context, config.validation_scope, config.scope_collections)
+    sampled_results = []
+    invalid_objects = main.check_all_objects(config, sampled_results, object_index)
+    return invalid_objects, object_index.total_faces(), sampled_results
+
+
+def load_validator(spec):
+    """Resolve a "module:function" validator, used to stand in for Blender when testing locally."""
+    if not spec:
+        return validate_blend_file
+    module_name, function_name = spec.split(":", 1)
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def validate_shard(shard, config, validator):
+    """Validate every file of a shard, errors are recorded per file instead of failing the whole shard."""
+    files = []
+    for filepath in shard["files"]:
+        start = time.time()
+        entry = {"file": filepath, "invalid_objects": [], "sampled_results": [], "face_count": None, "error": None}
+        try:
+            entry["invalid_objects"], entry["face_count"], entry["sampled_results"] = validator(filepath, config)
+        except Exception as e:
+            entry["error"] = str(e)
+            print(f"Error validating {filepath}: {e}")
+        entry["seconds"] = time.time() - start
+        files.append(entry)
+    return files
+
+
+def run_worker(queue_dir, worker_id, validator=validate_blend_file, poll_interval=1.0):
+    """Process shards until the coordinator writes STOP."""
+    queue = FileQueue(queue_dir)
+    state = {"value": "idle"}
+    stopped = threading.Event()
+
+    # Heartbeat from a separate thread so a single huge file doesn't make the worker look dead
+    def beat():
+        while not stopped.is_set():
+            try:
+                queue.heartbeat(worker_id, state["value"])
+            except OSError as e:
+                print(f"Heartbeat failed: {e}")
+            stopped.wait(queue.heartbeat_interval()) # Set by the coordinator, to match its stale timeout
+
+    heartbeat_thread = threading.Thread(target=beat, daemon=True)
+    heartbeat_thread.start()
+
+    shards_done = 0
+    try:
+        while not queue.should_stop():
+            shard = queue.claim(worker_id)
+            if shard is None:
+                state["value"] = "idle"
+                time.sleep(poll_interval)
+                continue
+
+            if queue.has_result(shard["id"]): # A backup copy of a shard that already finished elsewhere
+                queue.release(shard["id"], worker_id)
+                continue
+
+            state["value"] = "busy"
+            print(f"[{worker_id}] Shard {shard['id']}: {len(shard['files'])} files")
+            config = config_loader.load_config(queue.config_path) # Cached, only re-read if the file changed
+            files = validate_shard(shard, config, validator)
+            queue.put_result({"shard": shard["id"], "worker": worker_id, "files": files})
+            queue.release(shard["id"], worker_id)
+            shards_done += 1
+    finally:
+        stopped.set()
+        heartbeat_thread.join()
+        queue.heartbeat(worker_id, "stopped")
+
+    print(f"[{worker_id}] Finished, {shards_done} shards validated")
+    return shards_done
+
+
+def main():
+    # Blender passes its own arguments first, ours follow after "--"
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Validation worker for distributed runs")
+    parser.add_argument("--queue", required=True, help="Shared queue folder written by the coordinator")
+    parser.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="Unique worker name (defaults to host name and process id)")
+    parser.add_argument("--validator", default="", help="module:function replacing the Blender validation (testing)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+    args = parser.parse_args(argv)
+
+    run_worker(args.queue, args.worker_id, load_validator(args.validator), args.poll_interval)
+
+
+if __name__ == "__main__":
+    main()
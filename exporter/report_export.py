@@ -1,6 +1,45 @@
 import os
 
-def export_invalid_objects_report(invalid_objects, filepath="invalid_objects_report.txt"):
+def format_invalid_objects_report(invalid_objects, title="Invalid Objects Report",
+                                  empty_message="All objects passed the checks.", sampled_results=None):
+    """
+    Build the report text as a list of lines.
+    Items with a "file" key (merged from several .blend files) also show the file name.
+    sampled_results lists checks that passed on a sample only, they get their own section.
+    """
+    lines = []
+    lines.append(title)
+    lines.append("=" * len(title))
+    lines.append("")
+    
+    if not invalid_objects:
+        lines.append(empty_message)
+    else:
+        lines.append(f"Total invalid objects: {len(invalid_objects)}")
+        lines.append("")
+        
+        for item in invalid_objects:
+            if item.get('file'):
+                lines.append(f"- {item['object']} ({item['file']}):")
+            else:
+                lines.append(f"- {item['object']}:")
+            for reason in item['reasons']:
+                lines.append(f"    Reason: {reason}")
+            lines.append("")  # Blank line for separation
+    
+    if sampled_results:
+        lines.append("")
+        lines.append(f"Sampled checks (passed, not exhaustive): {len(sampled_results)}")
+        lines.append("")
+        for item in sampled_results:
+            if item.get('file'):
+                lines.append(f"- {item['object']} ({item['file']}): {item['message']}")
+            else:
+                lines.append(f"- {item['object']}: {item['message']}")
+    
+    return lines
+
+def export_invalid_objects_report(invalid_objects, filepath="invalid_objects_report.txt", sampled_results=None):
     """
     Export a text report of invalid objects and their reasons.
     Each object will list its name and the specific reasons for failure.
@@ -13,22 +52,7 @@ def export_invalid_objects_report(invalid_objects, filepath="invalid_objects_rep
             os.makedirs(directory, exist_ok=True)
             print(f"Created directory: {directory}")
         
-        lines = []
-        lines.append("Invalid Objects Report")
-        lines.append("=====================")
-        lines.append("")
-        
-        if not invalid_objects:
-            lines.append("All objects passed the checks.")
-        else:
-            lines.append(f"Total invalid objects: {len(invalid_objects)}")
-            lines.append("")
-            
-            for item in invalid_objects:
-                lines.append(f"- {item['object']}:")
-                for reason in item['reasons']:
-                    lines.append(f"    Reason: {reason}")
-                lines.append("")  # Blank line for separation
+        lines = format_invalid_objects_report(invalid_objects, sampled_results=sampled_results)
         
         # Write the file
         with open(filepath, "w", encoding="utf-8") as f:
@@ -0,0 +1,166 @@
+import json
+import os
+import sqlite3
+import time
+
+#######################################################################################################################
+# Append-only history of validation results in SQLite, for "what changed since last run" diffs and trends.
+# Every run adds one row to runs, and one row per failed check to results, keyed by file, object and check.
+# A check that passed without covering everything (sample mode) proves nothing, so a failure of the previous
+# run is carried over for it (carried = 1) instead of showing up as fixed. The same goes for every failure of a
+# file that could not be validated at all this run (a file_error row).
+#######################################################################################################################
+
+FILE_ERROR_CHECK = "file_error" # Check name of a file that failed to open or crashed its validation
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    label TEXT NOT NULL,
+    started REAL NOT NULL,
+    config TEXT
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    file TEXT NOT NULL,
+    object TEXT NOT NULL,
+    check_name TEXT NOT NULL,
+    message TEXT NOT NULL,
+    carried INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_label ON runs(label, id);
+CREATE INDEX IF NOT EXISTS idx_results_run ON results(run_id, file, object, check_name);
+"""
+
+
+def open_store(db_path):
+    """Open (and create if needed) the result store."""
+    directory = os.path.dirname(db_path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+
+    # Stores created before carried failures existed
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(results)")]
+    if "carried" not in columns:
+        with conn:
+            conn.execute("ALTER TABLE results ADD COLUMN carried INTEGER NOT NULL DEFAULT 0")
+    return conn
+
+
+def record_run(conn, invalid_objects, label, config=None, sampled_results=None):
+    """
+    Store the invalid objects of one run and return the new run id.
+    label groups runs that should be compared with each other (e.g. the .blend file path).
+    Each item's "checks" names the check behind each reason, items without it fall back to the reason text.
+    sampled_results are checks that passed without covering everything. If they failed in the previous run,
+    that failure is carried over, so a sample that missed the problem is not reported as a fix.
+    Files with a FILE_ERROR_CHECK failure keep all their previous failures the same way.
+    """
+    with conn: # One transaction per run
+        cursor = conn.execute("INSERT INTO runs (label, started, config) VALUES (?, ?, ?)",
+                              (label, time.time(), json.dumps(config) if config is not None else None))
+        run_id = cursor.lastrowid
+
+        rows = []
+        for item in invalid_objects:
+            checks = item.get("checks") or item["reasons"]
+            for check_name, reason in zip(checks, item["reasons"]):
+                rows.append((run_id, item.get("file") or label, item["object"], check_name, reason, 0))
+
+        previous_id = previous_run_id(conn, run_id)
+        errored_files = {row[1] for row in rows if row[3] == FILE_ERROR_CHECK}
+        if errored_files and previous_id is not None:
+            for file in sorted(errored_files):
+                cursor = conn.execute("""
+                    SELECT file, object, check_name, message FROM results
+                    WHERE run_id = ? AND file = ? AND check_name != ? ORDER BY rowid""",
+                                      (previous_id, file, FILE_ERROR_CHECK))
+                rows.extend((run_id,) + previous + (1,) for previous in cursor)
+        if sampled_results and previous_id is not None:
+            for item in sampled_results:
+                key = (item.get("file") or label, item["object"], item["check"])
+                previous = conn.execute("""
+                    SELECT message FROM results
+                    WHERE run_id = ? AND file = ? AND object = ? AND check_name = ?""", (previous_id,) + key).fetchone()
+                if previous:
+                    rows.append((run_id,) + key + (previous[0], 1))
+
+        conn.executemany("""
+            INSERT INTO results (run_id, file, object, check_name, message, carried)
+            VALUES (?, ?, ?, ?, ?, ?)""", rows)
+    return run_id
+
+
+def latest_run_id(conn, label):
+    row = conn.execute("SELECT MAX(id) FROM runs WHERE label = ?", (label,)).fetchone()
+    return row[0]
+
+
+def previous_run_id(conn, run_id):
+    """Return the run before run_id with the same label, or None for the first run."""
+    row = conn.execute("SELECT MAX(id) FROM runs WHERE label = (SELECT label FROM runs WHERE id = ?) AND id < ?",
+                       (run_id, run_id)).fetchone()
+    return row[0]
+
+
+def _rows_only_in(conn, run_id, other_run_id):
+    """Failures of run_id whose (file, object, check) key is not failing in other_run_id."""
+    cursor = conn.execute("""
+        SELECT r.file, r.object, r.check_name, r.message FROM results r
+        WHERE r.run_id = ? AND NOT EXISTS (
+            SELECT 1 FROM results o
+            WHERE o.run_id = ? AND o.file = r.file AND o.object = r.object AND o.check_name = r.check_name)
+        ORDER BY r.file, r.object, r.rowid""", (run_id, other_run_id))
+    return [{"file": file, "object": obj, "check": check_name, "message": message}
+            for file, obj, check_name, message in cursor]
+
+
+def diff_runs(conn, run_id, previous_id=None):
+    """
+    Compare a run with the previous run of the same label (or previous_id).
+    Returns {"previous_run": id, "new": [...], "fixed": [...]} with one dictionary per failed check.
+    Without a previous run every failure counts as new.
+    """
+    if previous_id is None:
+        previous_id = previous_run_id(conn, run_id)
+    if previous_id is None:
+        return {"previous_run": None, "new": _rows_only_in(conn, run_id, -1), "fixed": []}
+    return {
+        "previous_run": previous_id,
+        "new": _rows_only_in(conn, run_id, previous_id),
+        "fixed": _rows_only_in(conn, previous_id, run_id),
+    }
+
+
+def check_trend(conn, label, limit=10):
+    """
+    Failure counts per check for the last runs of a label, oldest first: [(run_id, started, {check: count})].
+    Carried over failures are counted, they were not shown to be fixed.
+    """
+    runs = conn.execute("SELECT id, started FROM runs WHERE label = ? ORDER BY id DESC LIMIT ?",
+                        (label, limit)).fetchall()
+    trend = []
+    for run_id, started in reversed(runs):
+        counts = dict(conn.execute("SELECT check_name, COUNT(*) FROM results WHERE run_id = ? GROUP BY check_name",
+                                   (run_id,)))
+        trend.append((run_id, started, counts))
+    return trend
+
+
+def rows_to_invalid_objects(rows, label=None):
+    """Group result rows back into the invalid objects format used by report_export."""
+    invalid_objects = []
+    by_key = {}
+    for row in rows:
+        key = (row["file"], row["object"])
+        if key not in by_key:
+            item = {"object": row["object"], "reasons": [], "checks": []}
+            if row["file"] != label: # The file is only worth showing when the run covers several
+                item["file"] = row["file"]
+            by_key[key] = item
+            invalid_objects.append(item)
+        by_key[key]["reasons"].append(row["message"])
+        by_key[key]["checks"].append(row["check"])
+    return invalid_objects
@@ -1,5 +1,4 @@
 import bpy
-import json
 import sys
 import os
 import importlib
@@ -18,8 +17,8 @@ print(f"Current First Python path: {sys.path[:1]}...")
 # This is to avoid error of "Module ... has no attribute ..."
 def reload_modules():
     """Force reload all custom modules to pick up changes."""
-    modules = ['checker.name_check', 'checker.mesh_check', 'checker.pivot_check', 
-               'checker.lod_check', 'checker.bone_check', 'exporter.report_export']
+    modules = ['config_loader', 'object_scope', 'checker.name_check', 'checker.mesh_check', 'checker.pivot_check', 
+               'checker.lod_check', 'checker.bone_check', 'exporter.report_export', 'exporter.result_store']
     for module in modules:
         if module in sys.modules: # If the module is already loaded
             importlib.reload(sys.modules[module]) # Reload the module
@@ -28,58 +27,90 @@ def reload_modules():
 reload_modules()
 
 # After script_dir is specified, and modules are reloaded
+import config_loader
+import object_scope
 from checker import name_check, mesh_check, pivot_check, lod_check, bone_check
-from exporter import report_export
+from exporter import report_export, result_store
 
 #######################################################################################################################
 # This script is an ETL (Extract, Transform, Load) tool for Blender.
 #######################################################################################################################
 
-# Load configuration from config.json
-def load_config(config):
+# Load configuration from config.json (typed and cached, see config_loader)
+def load_config(config, profile=None):
     config_path = os.path.join(script_dir, config)
-    with open(config_path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def check_all_objects(config):
-    invalid_objects = [] # A list of dictionaries, objcet name as key, and a list of reasons as values
-
-    for obj in bpy.data.objects:  # Iterate through all objects in the scene and do all checks
-        reasons = [] # Collect reasons for invalid objects
-
-        # Mesh face check
-        ok_faces, msg_faces = mesh_check.check_mesh_faces(obj, config["max_faces"])
+    return config_loader.load_config(config_path, profile)
+
+def check_all_objects(config, sampled_results=None, object_index=None):
+    """
+    Run all checks on the objects in scope and return the invalid ones.
+    The scope comes from the config unless a prebuilt object_index (see object_scope) is passed.
+    Passing checks that did not cover every vertex (sample mode) are appended to sampled_results, if given.
+    """
+    if object_index is None:
+        object_index = object_scope.build_object_index(bpy.context, config.validation_scope, config.scope_collections)
+
+    failures = {} # Object name -> invalid object entry, reasons in check order
+    def add_failure(obj, check, reason):
+        entry = failures.setdefault(obj.name, {
+            "object": obj.name, # Name of the object
+            "reasons": [], # List reasons
+            "checks": [] # Name of the check behind each reason, used as key in the result store
+        })
+        entry["reasons"].append(reason)
+        entry["checks"].append(check)
+
+    meshes = object_index.meshes # Mesh checks only iterate the mesh bucket
+
+    # Mesh face check
+    for obj in meshes:
+        ok_faces, msg_faces = mesh_check.check_mesh_faces(obj, config.max_faces)
         if not ok_faces:
-            reasons.append(msg_faces)
+            add_failure(obj, "max_faces", msg_faces)
 
-        # Name check (using allowed suffixes)
-        allowed_suffixes = config["allowed_name_suffixes"]
-        ok_name, msg_name = name_check.check_object_name(obj, allowed_suffixes)
+    # Name check (using the precomputed suffix tuple), applies to every object type
+    for obj in object_index.objects:
+        ok_name, msg_name = name_check.check_object_name(obj, config.name_suffixes)
         if not ok_name:
-            reasons.append(msg_name)
-
-        # Close vertices check (only for mesh objects)
-        if obj.type == 'MESH':
-            min_distance = config["min_vertex_distance"]
-            ok_vertices, msg_vertices, close_pairs = mesh_check.check_close_vertices(obj, min_distance) # close_pairs left for future use
-            if not ok_vertices:
-                reasons.append(msg_vertices)
-
-        if reasons:
-            invalid_objects.append({
-                "object": obj.name, # Name of the object
-                "reasons": reasons # List reasons
+            add_failure(obj, "name_suffix", msg_name)
+
+    # Close vertices check
+    for obj in meshes:
+        ok_vertices, msg_vertices, close_pairs, evaluation = mesh_check.evaluate_close_vertices(
+            obj, config.min_vertex_distance, config.min_vertex_distance_sq,
+            config.close_vertices_mode, config.sample_time_budget) # close_pairs left for future use
+        if not ok_vertices:
+            add_failure(obj, "close_vertices", msg_vertices)
+        elif not evaluation["exact"] and sampled_results is not None:
+            sampled_results.append({
+                "object": obj.name,
+                "check": "close_vertices",
+                "message": msg_vertices,
+                "detection_probability": evaluation["detection_probability"]
             })
 
-    return invalid_objects
+    # Report in scene order
+    return [failures[obj.name] for obj in object_index.objects if obj.name in failures]
 
 def main():
     config = load_config("config.json")
-    invalid_objects = check_all_objects(config)
+    sampled_results = [] # Checks that passed without covering every vertex
+    invalid_objects = check_all_objects(config, sampled_results)
 
-    # Export txt report for invalid objects only
+    # Export txt report for invalid objects only (plus the sampled passes, so they are not mistaken for exact)
     report_path = os.path.join(script_dir, "report.txt")
-    report_export.export_invalid_objects_report(invalid_objects, report_path)
+    report_export.export_invalid_objects_report(invalid_objects, report_path, sampled_results)
+
+    # Append the results to the history store, so runs can be diffed and trended
+    db_path = os.path.join(script_dir, "results.db")
+    conn = result_store.open_store(db_path)
+    try:
+        run_label = object_scope.run_label(config) # Runs of the same file and scope are compared with each other
+        run_id = result_store.record_run(conn, invalid_objects, run_label, config.to_dict(), sampled_results)
+        diff = result_store.diff_runs(conn, run_id)
+        print(f"Run {run_id}: {len(diff['new'])} new failures, {len(diff['fixed'])} fixed since last run")
+    finally:
+        conn.close()
     '''
     for res in results:
         # Read from the dictionary
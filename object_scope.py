@@ -0,0 +1,73 @@
+import bpy
+
+import config_loader
+
+#######################################################################################################################
+# Scoping of a validation run: which objects are checked, bucketed by type once so each check only
+# iterates the objects it applies to.
+#######################################################################################################################
+
+# Must match config_loader.VALIDATION_SCOPES
+SCOPE_SCENE = "scene"
+SCOPE_SELECTION = "selection"
+SCOPE_VISIBLE = "visible"
+SCOPE_COLLECTIONS = "collections"
+
+
+class ObjectIndex:
+    """Objects of one validation run, with a per-type bucket built in a single pass."""
+
+    def __init__(self, objects):
+        self.objects = [] # All objects in scope, in scene order
+        self.by_type = {} # obj.type -> list of objects
+        for obj in objects:
+            self.objects.append(obj)
+            self.by_type.setdefault(obj.type, []).append(obj)
+
+    def of_type(self, obj_type):
+        return self.by_type.get(obj_type, [])
+
+    @property
+    def meshes(self):
+        return self.of_type('MESH')
+
+    def total_faces(self):
+        """Face count summed over all mesh objects in scope."""
+        return sum(len(obj.data.polygons) for obj in self.meshes if obj.data)
+
+    def __len__(self):
+        return len(self.objects)
+
+
+def collect_scope_objects(context, scope=SCOPE_SCENE, collection_names=()):
+    """Return the objects of the given scope, only objects linked to the current scene are considered."""
+    scene_objects = context.scene.objects
+
+    if scope == SCOPE_SCENE:
+        return list(scene_objects)
+    if scope == SCOPE_SELECTION:
+        return [obj for obj in scene_objects if obj.select_get()]
+    if scope == SCOPE_VISIBLE:
+        return [obj for obj in scene_objects if obj.visible_get()]
+    if scope == SCOPE_COLLECTIONS:
+        if not collection_names:
+            raise ValueError("No collections given to validate") # Would otherwise report an empty scope as passing
+        objects = {} # Keyed by name, an object can be linked to several of the collections
+        for name in collection_names:
+            collection = bpy.data.collections.get(name)
+            if collection is None:
+                raise ValueError(f"Collection '{name}' not found")
+            for obj in collection.all_objects: # Includes objects of child collections
+                objects.setdefault(obj.name, obj)
+        return [obj for obj in objects.values() if obj.name in scene_objects]
+    raise ValueError(f"Unknown validation scope '{scope}'")
+
+
+def build_object_index(context, scope=SCOPE_SCENE, collection_names=()):
+    """Build the type-bucketed index of the objects in scope, once per validation run."""
+    return ObjectIndex(collect_scope_objects(context, scope, collection_names))
+
+
+def run_label(config):
+    """Label of a run in the result store: the .blend file, plus the scope if not the whole scene."""
+    return (bpy.data.filepath or "untitled") + config_loader.scope_suffix(config)
@@ -0,0 +1,32 @@
+import os
+import time
+
+#######################################################################################################################
+# Stand-in for the Blender validation, used by local worker processes in tests/test_distributed.py.
+# The file name picks the behaviour, every attempt is logged to $ETL_STUB_DIR/<file>.attempts:
+#   raise*.blend  raises on every attempt
+#   die*.blend    kills the worker process on the first attempt
+#   slow*.blend   hangs on the first attempt
+#######################################################################################################################
+
+
+def validate(filepath, config):
+    name = os.path.basename(filepath)
+    attempts_path = os.path.join(os.environ["ETL_STUB_DIR"], f"{name}.attempts")
+    with open(attempts_path, "a", encoding="utf-8") as f:
+        f.write(f"{os.getpid()}\n")
+    with open(attempts_path, "r", encoding="utf-8") as f:
+        first_attempt = len(f.read().split()) == 1
+
+    if name.startswith("raise"):
+        raise RuntimeError("corrupt file")
+    if name.startswith("die") and first_attempt:
+        os._exit(1)
+    if name.startswith("slow") and first_attempt:
+        time.sleep(60)
+
+    reasons = [f"Object 'Cube' does not end with {list(config.name_suffixes)}."]
+    invalid_objects = [{"object": "Cube", "reasons": reasons, "checks": ["name_suffix"]}]
+    sampled_results = [{"object": "Sphere", "check": "close_vertices", "detection_probability": 0.5,
+                        "message": "Mesh 'Sphere' has no vertices closer than 0.1 [sampled 30% of vertices]"}]
+    return invalid_objects, 12, sampled_results
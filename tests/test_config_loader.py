@@ -0,0 +1,102 @@
+import json
+import os
+import sys
+
+import pytest
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+script_dir = os.path.dirname(tests_dir)
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+import config_loader
+
+
+def write(path, raw):
+    path.write_text(json.dumps(raw), encoding="utf-8")
+
+
+def read(path):
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def test_profile_overlays_base_settings(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, {"max_faces": 300, "profiles": {"mobile": {"max_faces": 150}}, "active_profile": "mobile"})
+
+    assert config_loader.load_config(str(path)).max_faces == 150
+    assert config_loader.load_config(str(path), "").max_faces == 300 # Falsy profile means the base settings
+    assert config_loader.load_config(str(path)).min_vertex_distance == 0.001 # Schema default
+    with pytest.raises(ValueError):
+        config_loader.load_config(str(path), "console")
+
+
+@pytest.mark.parametrize("raw", [
+    {"max_face": 300}, # Misspelled setting
+    {"profiles": {"mobile": {"max_face": 150}}, "active_profile": "mobile"},
+    {"max_faces": True},
+    {"close_vertices_mode": "fast"},
+    {"validation_scope": "collections"}, # Without collection names
+])
+def test_invalid_configs_are_rejected(raw):
+    with pytest.raises(ValueError):
+        config_loader.build_config(raw)
+
+
+def test_cache_is_rebuilt_when_the_file_changes(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, {"max_faces": 300})
+    config = config_loader.load_config(str(path))
+    assert config_loader.load_config(str(path)) is config
+
+    write(path, {"max_faces": 3000}) # Different size, so noticed even within the mtime resolution
+    assert config_loader.load_config(str(path)).max_faces == 3000
+
+
+def test_cached_config_is_read_only(tmp_path):
+    config = config_loader.load_config(str(tmp_path / "missing.json"))
+    with pytest.raises(AttributeError):
+        config.max_faces = 1
+    with pytest.raises(AttributeError):
+        config.allowed_name_suffixes.append("_tmp")
+
+    changed = config.with_values(max_faces=1)
+    assert (changed.max_faces, config.max_faces) == (1, 50000)
+    with pytest.raises(ValueError):
+        config.with_values(max_faces=0)
+
+
+def test_save_skips_unchanged_values(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, {"max_faces": 300})
+    mtime = os.stat(path).st_mtime_ns
+
+    assert not config_loader.save_config(str(path), {"max_faces": 300})
+    assert os.stat(path).st_mtime_ns == mtime
+
+    assert config_loader.save_config(str(path), {"max_faces": 400})
+    assert read(path) == {"max_faces": 400}
+    assert [name for name in os.listdir(tmp_path) if name != "config.json"] == [] # No temporary file left behind
+
+
+def test_save_into_profile_only_keeps_overrides(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, {"max_faces": 300, "profiles": {"mobile": {"max_faces": 150}}, "active_profile": "mobile"})
+
+    # Everything the dialog shows is saved, only values differing from the base end up in the profile
+    values = dict(config_loader.load_config(str(path)).to_dict(), min_vertex_distance=0.5)
+    assert config_loader.save_config(str(path), values)
+    assert read(path)["profiles"]["mobile"] == {"max_faces": 150, "min_vertex_distance": 0.5}
+
+    # Setting a value back to the base removes the override
+    assert config_loader.save_config(str(path), {"max_faces": 300})
+    assert read(path)["profiles"]["mobile"] == {"min_vertex_distance": 0.5}
+    assert read(path)["max_faces"] == 300
+
+
+def test_save_rejects_invalid_combinations(tmp_path):
+    path = tmp_path / "config.json"
+    write(path, {"max_faces": 300})
+    with pytest.raises(ValueError):
+        config_loader.save_config(str(path), {"validation_scope": "collections"})
+    assert read(path) == {"max_faces": 300}
@@ -0,0 +1,165 @@
+import os
+import sys
+import time
+
+import pytest
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+script_dir = os.path.dirname(tests_dir)
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+import config_loader
+from distributed import coordinator
+from distributed.file_queue import FileQueue, read_json, write_json_atomic
+from exporter import result_store
+
+# Fast heartbeats so dead workers are noticed within a second
+HEARTBEAT_INTERVAL = 0.2
+STALE_TIMEOUT = 1.0
+WORKER_COMMAND = f'"{sys.executable}" "{coordinator.WORKER_SCRIPT}"'
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """Folder for fake .blend files, with the stub validator importable by the worker processes."""
+    stub_dir = tmp_path / "attempts"
+    stub_dir.mkdir()
+    monkeypatch.setenv("ETL_STUB_DIR", str(stub_dir))
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [tests_dir, os.environ.get("PYTHONPATH")])))
+
+    assets = tmp_path / "assets"
+    assets.mkdir()
+
+    def make(*names):
+        for index, name in enumerate(names):
+            (assets / name).write_bytes(b"x" * 200 * (index + 1))
+        return coordinator.find_blend_files([str(assets)])
+
+    return make
+
+
+def attempts(tmp_path, name):
+    path = tmp_path / "attempts" / f"{name}.attempts"
+    return len(path.read_text().split()) if path.exists() else 0
+
+
+def run(tmp_path, blend_files, **kwargs):
+    return coordinator.run_coordinator(
+        blend_files, str(tmp_path / "queue"), config_loader.build_config({}), str(tmp_path / "report.txt"),
+        worker_count=3, local_workers=3, worker_command=WORKER_COMMAND,
+        worker_args=["--validator", "distributed_stubs:validate", "--poll-interval", "0.1"],
+        stale_timeout=STALE_TIMEOUT, heartbeat_interval=HEARTBEAT_INTERVAL, poll_interval=0.1, **kwargs)
+
+
+def test_file_error_is_reported_per_file(tmp_path, library):
+    blend_files = library("a.blend", "b.blend", "raise.blend", "c.blend")
+    invalid_objects = run(tmp_path, blend_files)
+
+    errors = [item for item in invalid_objects if item["checks"] == ["file_error"]]
+    assert [os.path.basename(item["file"]) for item in errors] == ["raise.blend"]
+    assert "corrupt file" in errors[0]["reasons"][0]
+    assert sorted(item["file"] for item in invalid_objects if item not in errors) == \
+        sorted(path for path in blend_files if not path.endswith("raise.blend"))
+    report = (tmp_path / "report.txt").read_text()
+    assert "raise.blend" in report
+    # Sampled passes of every validated file reach the merged report
+    assert "Sampled checks (passed, not exhaustive): 3" in report
+
+
+def test_dead_worker_shard_is_validated_again(tmp_path, library):
+    blend_files = library("a.blend", "b.blend", "die.blend", "c.blend", "d.blend")
+    invalid_objects = run(tmp_path, blend_files)
+
+    assert sorted(item["file"] for item in invalid_objects) == blend_files
+    assert attempts(tmp_path, "die.blend") == 2
+
+
+def test_slow_shard_gets_backup_copy(tmp_path, library):
+    blend_files = library("a.blend", "b.blend", "slow.blend", "c.blend")
+    start = time.time()
+    invalid_objects = run(tmp_path, blend_files, shutdown_timeout=1.0)
+
+    assert time.time() - start < 30 # The hanging first attempt was not waited for
+    assert sorted(item["file"] for item in invalid_objects) == blend_files
+    assert attempts(tmp_path, "slow.blend") == 2
+
+
+def test_stale_claim_is_requeued(tmp_path):
+    queue = FileQueue(str(tmp_path / "queue"))
+    queue.reset()
+    queue.put_shard({"id": "00000", "cost": 1, "files": ["a.blend"]})
+    assert queue.claim("box01")["id"] == "00000"
+    queue.heartbeat("box01", "busy")
+    liveness = coordinator.Liveness()
+
+    coordinator.rebalance(queue, {}, set(), 0.3, liveness)
+    time.sleep(0.4)
+    queue.heartbeat("box01", "busy")
+    coordinator.rebalance(queue, {}, set(), 0.3, liveness)
+    assert queue.pending_count() == 0 # Still beating
+
+    time.sleep(0.4)
+    coordinator.rebalance(queue, {}, set(), 0.3, liveness)
+    assert queue.pending_count() == 1
+    assert queue.claims() == []
+
+
+@pytest.mark.parametrize("skew", [-3600, 3600])
+def test_worker_clock_skew_is_ignored(tmp_path, skew):
+    queue = FileQueue(str(tmp_path / "queue"))
+    queue.reset()
+    queue.put_shard({"id": "00000", "cost": 1, "files": ["a.blend"]})
+    queue.claim("box01")
+    liveness = coordinator.Liveness()
+
+    def beat(number):
+        # Heartbeat as written by a machine whose clock is an hour behind or ahead
+        write_json_atomic(os.path.join(queue.heartbeats_dir, "box01.json"),
+                          {"worker": "box01", "state": "busy", "beat": ["session", number], "time": time.time() + skew})
+
+    beat(1)
+    coordinator.rebalance(queue, {}, set(), 0.3, liveness)
+    time.sleep(0.4)
+    beat(2)
+    coordinator.rebalance(queue, {}, set(), 0.3, liveness)
+    assert queue.pending_count() == 0 # Alive, however far behind its clock is
+
+    time.sleep(0.4)
+    coordinator.rebalance(queue, {}, set(), 0.3, liveness)
+    assert queue.pending_count() == 1 # Silent since the last beat, however far ahead its clock is
+
+
+def test_stale_timeout_must_cover_several_heartbeats(tmp_path):
+    with pytest.raises(ValueError):
+        coordinator.run_coordinator([], str(tmp_path / "queue"), config_loader.build_config({}),
+                                    str(tmp_path / "report.txt"), stale_timeout=2, heartbeat_interval=5)
+
+
+def test_library_runs_ignore_the_dialog_scope(tmp_path):
+    dialog_config = config_loader.build_config({"validation_scope": "selection"})
+    coordinator.run_coordinator([], str(tmp_path / "queue"), dialog_config, str(tmp_path / "report.txt"))
+
+    worker_config = config_loader.load_config(str(tmp_path / "queue" / "config.json"))
+    assert worker_config.validation_scope == "scene"
+    assert set(read_json(str(tmp_path / "queue" / "config.json"))) == set(config_loader.CONFIG_SCHEMA) # Not only changed keys
+
+    coordinator.run_coordinator([], str(tmp_path / "queue"), dialog_config, str(tmp_path / "report.txt"),
+                                scope="collections", scope_collections=["Props"])
+    worker_config = config_loader.load_config(str(tmp_path / "queue" / "config.json"))
+    assert (worker_config.validation_scope, worker_config.scope_collections) == ("collections", ("Props",))
+
+
+def test_library_run_label_includes_the_scope(tmp_path):
+    results_db = str(tmp_path / "results.db")
+    for scope, collections in (("scene", []), ("collections", ["Props"])):
+        coordinator.run_coordinator([], str(tmp_path / "queue"), config_loader.build_config({}),
+                                    str(tmp_path / "report.txt"), results_db=results_db,
+                                    scope=scope, scope_collections=collections)
+
+    conn = result_store.open_store(results_db)
+    try:
+        labels = [row[0] for row in conn.execute("SELECT label FROM runs ORDER BY id")]
+    finally:
+        conn.close()
+    assert labels == ["library", "library [collections: Props]"]
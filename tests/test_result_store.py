@@ -0,0 +1,60 @@
+import os
+import sys
+
+tests_dir = os.path.dirname(os.path.abspath(__file__))
+script_dir = os.path.dirname(tests_dir)
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+from exporter import result_store
+
+CLOSE = {"object": "Sphere_geo", "reasons": ["Mesh 'Sphere_geo' has 3 vertex pairs closer than 0.1"],
+         "checks": ["close_vertices"]}
+FILE_ERROR = {"file": "scene.blend", "object": "scene.blend", "reasons": ["Error validating file: corrupt file"],
+              "checks": ["file_error"]}
+SAMPLED_PASS = {"object": "Sphere_geo", "check": "close_vertices", "detection_probability": 0.3,
+                "message": "Mesh 'Sphere_geo' has no vertices closer than 0.1 [sampled 16% of vertices]"}
+
+
+def test_exact_pass_counts_as_fixed(tmp_path):
+    conn = result_store.open_store(str(tmp_path / "results.db"))
+    result_store.record_run(conn, [CLOSE], "scene.blend")
+    run_id = result_store.record_run(conn, [], "scene.blend")
+
+    diff = result_store.diff_runs(conn, run_id)
+    assert [row["object"] for row in diff["fixed"]] == ["Sphere_geo"]
+    assert diff["new"] == []
+
+
+def test_sampled_pass_keeps_previous_failure(tmp_path):
+    conn = result_store.open_store(str(tmp_path / "results.db"))
+    result_store.record_run(conn, [CLOSE], "scene.blend")
+    sampled_run = result_store.record_run(conn, [], "scene.blend", sampled_results=[SAMPLED_PASS])
+    assert result_store.diff_runs(conn, sampled_run) == {"previous_run": sampled_run - 1, "new": [], "fixed": []}
+
+    # The failure is still known, so finding it again is not new either
+    failed_again = result_store.record_run(conn, [CLOSE], "scene.blend")
+    assert result_store.diff_runs(conn, failed_again)["new"] == []
+
+
+def test_file_error_keeps_previous_failures(tmp_path):
+    conn = result_store.open_store(str(tmp_path / "results.db"))
+    result_store.record_run(conn, [CLOSE], "scene.blend")
+    error_run = result_store.record_run(conn, [FILE_ERROR], "scene.blend")
+
+    diff = result_store.diff_runs(conn, error_run)
+    assert diff["fixed"] == []
+    assert [row["check"] for row in diff["new"]] == ["file_error"]
+
+    # Once the file opens again, a real pass is a fix of the carried failure
+    fixed_run = result_store.record_run(conn, [], "scene.blend")
+    assert sorted(row["check"] for row in result_store.diff_runs(conn, fixed_run)["fixed"]) == \
+        ["close_vertices", "file_error"]
+
+
+def test_sampled_pass_without_previous_failure_stores_nothing(tmp_path):
+    conn = result_store.open_store(str(tmp_path / "results.db"))
+    result_store.record_run(conn, [], "scene.blend")
+    run_id = result_store.record_run(conn, [], "scene.blend", sampled_results=[SAMPLED_PASS])
+    assert result_store.check_trend(conn, "scene.blend")[-1][2] == {}
+    assert result_store.diff_runs(conn, run_id)["fixed"] == []